@@ -1,36 +1,104 @@
 import os
-from typing import Optional
 import json
-from icmplib import traceroute
-from dotenv import load_dotenv
-from nmap import nmap
-from nmap3 import nmap3
-from psutil import net_connections
+import socket
+import subprocess
+import time
+from typing import TYPE_CHECKING, ClassVar, Dict, List, Optional
+from xml.etree import ElementTree
 from .base import SecurityTool, SecurityToolResult
 
+if TYPE_CHECKING:
+    from icmplib import Hop
+
+# Row template for traceroute reports, bound once so each hop is a single format call
+_HOP_FMT = "{:<15} {:<15} {} ms \t\t\t{:<5}\n".format
+
+
+def _batched_traceroute(address: str, max_hops: int = 20, timeout: float = 2) -> List["Hop"]:
+    """
+    Traceroute that probes every hop at once.
+
+    One echo request per TTL is sent back to back on a single raw socket and the replies are then
+    collected until the timeout, so the whole route costs about one round trip instead of one
+    (or a full timeout) per hop.
+
+    Args:
+        address (str): The target host name or IP address.
+        max_hops (int): The highest TTL to probe.
+        timeout (float): Seconds to wait for replies after the last probe is sent.
+
+    Returns:
+        List[Hop]: The hops that answered, ordered by distance and ending at the target if it was reached.
+    """
+    from icmplib import (Hop, ICMPRequest, ICMPv4Socket, ICMPv6Socket, TimeoutExceeded, is_hostname,
+                         is_ipv6_address, resolve)
+    from icmplib.utils import unique_identifier
+
+    if is_hostname(address):
+        address = resolve(address)[0]
+
+    socket_class = ICMPv6Socket if is_ipv6_address(address) else ICMPv4Socket
+    probe_id = unique_identifier()
+    requests = {}
+    replies = {}
+
+    with socket_class() as sock:
+        for ttl in range(1, max_hops + 1):
+            request = ICMPRequest(destination=address, id=probe_id, sequence=ttl, ttl=ttl)
+            sock.send(request)
+            requests[ttl] = request
+
+        deadline = time.monotonic() + timeout
+        while True:
+            # Stop early once the target answered and every hop in front of it did too
+            reached = [ttl for ttl, reply in replies.items() if reply.source == address]
+            if reached and all(ttl in replies for ttl in range(1, min(reached))):
+                break
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                reply = sock.receive(None, remaining)
+            except TimeoutExceeded:
+                break
+            if reply.id == probe_id and reply.sequence in requests:
+                replies.setdefault(reply.sequence, reply)
+
+    hops = []
+    for ttl in sorted(replies):
+        reply = replies[ttl]
+        rtt = (reply.time - requests[ttl].time) * 1000
+        hops.append(Hop(address=reply.source, packets_sent=1, rtts=[rtt], distance=ttl))
+        if reply.source == address:
+            break
+    return hops
+
 
 class ActiveReconnaissance(SecurityTool):
     """Class for performing active reconnaissance using Shodan API to gather details about a target system."""
 
+    # Maps each supported operation to the name of the method that implements it
+    _OPS: ClassVar[Dict[str, str]] = {
+        'print_net_connections': '_print_net_connections',
+        'check_traceroute': '_check_traceroute',
+        '_port_scan': '_port_scan',
+    }
+
     def __init__(self):
         """
         Initializes the ActiveReconnaissance instance.
 
         Attributes:
             _api (Shodan): The Shodan API client.
-            _cache (dict): A dictionary to cache the results of previous queries to improve performance.
         """
         super().__init__()
 
-        # Завантажуємо змінні середовища з .env файлу
-        load_dotenv()
-
         # # Отримуємо API-ключ із середовища
         # api_key = os.getenv('SHODAN_API_KEY')
         # if api_key is None:
         #     raise ValueError("Shodan API key is missing in environment variables.")
         # self._api = Shodan(api_key)
-        self._cache = {}  # Simple cache to store results of previous queries
 
     def execute(self, operation: str, target: str, **kwargs) -> SecurityToolResult:
         """
@@ -44,28 +112,18 @@ class ActiveReconnaissance(SecurityTool):
         Returns:
             SecurityToolResult: The result of the operation, either successful with data or failed with an error message.
         """
-
-        operations = {
-            'print_net_connections': self._print_net_connections,
-            'check_traceroute': self._check_traceroute,
-            '_port_scan': self._port_scan,
-        }
-        if operation not in operations:
+        method_name = self._OPS.get(operation)
+        if method_name is None:
             return SecurityToolResult(False, None, f"Unsupported operation: {operation}")
 
         try:
-
-            # If the operation requires a target, pass it, otherwise call without target
-            if operation == 'print_net_connections':
-                result = operations[operation]()  # This method does not need target
-            else:
-                result = operations[operation](target, **kwargs)  # Other operations might need target
+            result = getattr(self, method_name)(target, **kwargs)
             return SecurityToolResult(True, result)
         except Exception as e:
             self.logger.error(f"Error in {operation}: {str(e)}")
             return SecurityToolResult(False, None, str(e))
 
-    def _print_net_connections(self) -> str:
+    def _print_net_connections(self, target: Optional[str] = None) -> str:
         """
         Retrieve and return the current TCP and UDP network connections as a string.
 
@@ -74,7 +132,8 @@ class ActiveReconnaissance(SecurityTool):
         both the TCP and UDP connections.
 
         Args:
-            None
+            target (str, optional): Ignored; the connections are those of the local machine. It is
+                accepted so that every operation can be called the same way.
 
         Returns:
             str: A formatted string containing the TCP and UDP network connections.
@@ -83,24 +142,34 @@ class ActiveReconnaissance(SecurityTool):
             Exception: If there is an error retrieving the network connections.
         """
 
-        cache_key = f"net_connections_"
+        cache_key = f"{self.__class__.__name__}:net_connections:"
 
         # Check cache first to avoid redundant queries
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         try:
-            tcp_connections = net_connections(kind='tcp')
-            udp_connections = net_connections(kind='udp')
-
-
-            result = f"TCP connections:\n{tcp_connections}\n\nUDP connections:\n{udp_connections}"
-            self.log_operation("net_connections", {"TCP": tcp_connections, "UDP": udp_connections})
-            self._cache[cache_key] = result
-            return result
+            # Concurrent callers share a single scan of the connection table
+            return self._fetch_once(cache_key, self._collect_net_connections, expire=60)  # Local connections change quickly
         except Exception as e:
             raise Exception(f"Failed to retrieve network connections: {str(e)}")
 
+    def _collect_net_connections(self) -> str:
+        """Reads the current TCP and UDP connections and formats them for _print_net_connections."""
+        from psutil import net_connections
+
+        # One pass over the connection table, split by socket type afterwards
+        connections = net_connections(kind='inet')
+        tcp_connections = [conn for conn in connections if conn.type == socket.SOCK_STREAM]
+        udp_connections = [conn for conn in connections if conn.type == socket.SOCK_DGRAM]
+
+        tcp_lines = "\n".join(map(str, tcp_connections))
+        udp_lines = "\n".join(map(str, udp_connections))
+        result = f"TCP connections:\n{tcp_lines}\n\nUDP connections:\n{udp_lines}"
+        self.log_operation("net_connections", {"TCP": tcp_connections, "UDP": udp_connections})
+        return result
+
     def _check_traceroute(self, host: str) -> str:
         """
         Retrieve the traceroute information to the specified host as a formatted string.
@@ -117,35 +186,40 @@ class ActiveReconnaissance(SecurityTool):
         Raises:
             Exception: If there is an error retrieving the traceroute information.
         """
-        cache_key = f"traceroute_{host}"
+        cache_key = f"{self.__class__.__name__}:traceroute:{host}"
 
         # Check cache first to avoid redundant queries
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         try:
-            print('Checking hops for the host...')
-            hops = traceroute(host, max_hops=20)  # Perform traceroute
-            print('All Hops:\n', hops, '\n')
+            return self._fetch_once(cache_key, lambda: self._run_traceroute(host), expire=600)  # Routes change often
+        except Exception as e:
+            raise Exception(f"Failed to retrieve traceroute for {host}: {str(e)}")
 
-            result = "Distance/TTL \tAddress \tAverage round-trip time  \tPackets Sent\n"
-            last_distance = 0
+    def _run_traceroute(self, host: str) -> str:
+        """Performs the traceroute for _check_traceroute and formats the hops."""
+        print('Checking hops for the host...')
+        hops = _batched_traceroute(host, max_hops=20)  # Perform traceroute, all hops in flight at once
+        print('All Hops:\n', hops, '\n')
 
-            for hop in hops:
-                if last_distance + 1 != hop.distance:
-                    result += 'No response from gateway\n'
+        parts = ["Distance/TTL \tAddress \tAverage round-trip time  \tPackets Sent\n"]
+        last_distance = 0
 
-                # Append hop details to result
-                result += f'{hop.distance:<15} {hop.address:<15} {hop.avg_rtt} ms \t\t\t{hop.packets_sent:<5}\n'
+        for hop in hops:
+            if last_distance + 1 != hop.distance:
+                parts.append('No response from gateway\n')
 
-                last_distance = hop.distance
+            # Append hop details to result
+            parts.append(_HOP_FMT(hop.distance, hop.address, hop.avg_rtt, hop.packets_sent))
 
-            # Log operation and cache the result
-            self.log_operation("traceroute", {"host": host, "hops": hops})
-            self._cache[cache_key] = result
-            return result
-        except Exception as e:
-            raise Exception(f"Failed to retrieve traceroute for {host}: {str(e)}")
+            last_distance = hop.distance
+
+        result = "".join(parts)
+
+        self.log_operation("traceroute", {"host": host, "hops": hops})
+        return result
 
     def _port_scan(self, host: str) -> str:
         """
@@ -165,42 +239,67 @@ class ActiveReconnaissance(SecurityTool):
 
         Example from cmd
 
-        <nmap -oX - --top-ports {ip}>
+        <nmap -T4 --min-rate 5000 -n -Pn --open -p 1-1024 -oX - {ip}>
         <nmap -sV --script ssl-enum-ciphers -p {ip}> also might to add -Pn
         """
-        cache_key = f"port_scan_{host}"
+        cache_key = f"{self.__class__.__name__}:port_scan:{host}"
 
         # Check cache first to avoid redundant queries
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         try:
-            #
-
-
-            print(f"Scanning top ports for host {host}...")
-            nm = nmap.PortScanner()
-
-            # Perform Nmap's top ports scan
-            # Scan the top 1000 ports (you can increase or decrease this number)
-            scan_results = nm.scan(host, '1-1024')  # Example scanning ports 1 to 1024
-
-            # Prepare the result as a formatted string
-            result = "Port \tState \tService\n"
-
-            # Check if the host is up and has open ports
-            if 'host' in scan_results and host in scan_results['host']:
-                for port in scan_results['host'][host]['tcp']:
-                    state = scan_results['host'][host]['tcp'][port]['state']
-                    service = scan_results['host'][host]['tcp'][port].get('name', 'N/A')
-                    result += f'{port:<5} {state:<10} {service}\n'
-            else:
-                result = "No open ports found or the host is unreachable.\n"
-
-            # Log operation and cache the result
-            self.log_operation("port_scan", {"host": host, "scan_results": scan_results})
-            self._cache[cache_key] = result
-
-            return result
+            return self._fetch_once(cache_key, lambda: self._run_port_scan(host), expire=900)  # Services come and go
         except Exception as e:
-            raise Exception(f"Failed to perform port scan for {host}: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Failed to perform port scan for {host}: {str(e)}")
+
+    def _run_port_scan(self, host: str) -> str:
+        """Runs nmap for _port_scan and formats the open ports."""
+        # The host is the last argument; one starting with "-" would be read as an nmap option
+        if host.startswith("-"):
+            raise ValueError(f"Invalid host {host!r}")
+
+        print(f"Scanning top ports for host {host}...")
+
+        # Aggressive timing, no DNS resolution or host discovery, and only open ports in the XML report
+        command = ["nmap", "-T4", "--min-rate", "5000", "-n", "-Pn", "--open",
+                   "-p", "1-1024", "-oX", "-", host]
+
+        # Prepare the result as a formatted string
+        parts = ["Port \tState \tService\n"]
+        open_ports = []
+
+        parse_error = None
+        with subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as proc:
+            try:
+                # Parse the XML report while nmap streams it, dropping each <port> subtree once read
+                for _, elem in ElementTree.iterparse(proc.stdout, events=("end",)):
+                    if elem.tag != 'port':
+                        continue
+                    port = int(elem.get('portid'))
+                    state = elem.find('state').get('state')
+                    service_elem = elem.find('service')
+                    service = service_elem.get('name', 'N/A') if service_elem is not None else 'N/A'
+                    parts.append(f'{port:<5} {state:<10} {service}\n')
+                    open_ports.append(port)
+                    elem.clear()
+            except ElementTree.ParseError as e:
+                # A failed nmap run usually writes no XML; its exit status and stderr explain why
+                parse_error = e
+            # Drains whatever is left of both pipes and waits for nmap to exit
+            _, stderr = proc.communicate()
+            errors = stderr.decode(errors='replace').strip()
+
+        if proc.returncode != 0:
+            raise Exception(errors or f"nmap exited with code {proc.returncode}")
+        if parse_error is not None:
+            raise Exception(f"Unreadable nmap report: {parse_error}")
+
+        if open_ports:
+            result = "".join(parts)
+        else:
+            result = "No open ports found or the host is unreachable.\n"
+
+        self.log_operation("port_scan", {"host": host, "open_ports": open_ports})
+        return result
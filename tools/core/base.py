@@ -1,16 +1,37 @@
 # core/base.py
 from abc import ABC, abstractmethod
-from typing import Any, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import lru_cache
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import logging
+import time
 
+from .cache import get_cache
 
+# Entries in the last fraction of their lifetime are refreshed in the background when read
+REFRESH_AHEAD = 0.2
+
+_refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+_refreshing = set()  # Cache keys with a background refresh in progress
+_refreshing_lock = Lock()
+
+
+@lru_cache(maxsize=1)
+def _load_env():
+    """Load environment variables from the .env file once per process."""
+    from dotenv import load_dotenv
+    load_dotenv()
+
+
+@dataclass(slots=True)
 class SecurityToolResult:
     """Base class for tool operation results"""
 
-    def __init__(self, success: bool, data: Any, error: Optional[str] = None):
-        self.success = success
-        self.data = data
-        self.error = error
+    success: bool
+    data: Any
+    error: Optional[str] = None
 
     def __str__(self) -> str:
         if self.success:
@@ -22,13 +43,91 @@ class SecurityTool(ABC):
     """Base abstract class for all security tools"""
 
     def __init__(self):
+        _load_env()
         self.logger = logging.getLogger(self.__class__.__name__)
+        self._cache = get_cache()  # Persistent cache shared by every tool, so reruns reuse earlier answers
 
     @abstractmethod
     def execute(self, *args, **kwargs) -> SecurityToolResult:
         """Execute the security tool operation"""
         pass
 
+    def execute_many(self, jobs: List[Tuple[str, Any, Dict[str, Any]]]) -> List[SecurityToolResult]:
+        """
+        Executes several independent operations concurrently.
+
+        The operations are I/O-bound (network round trips, subprocess waits), so running them on a
+        thread pool brings the total wall-clock time down to roughly the slowest job.
+
+        Args:
+            jobs (list): A list of (operation, target, kwargs) tuples.
+
+        Returns:
+            list[SecurityToolResult]: The results, in the same order as the jobs.
+        """
+        if not jobs:
+            return []
+
+        with ThreadPoolExecutor(max_workers=min(32, len(jobs))) as executor:
+            return list(executor.map(lambda job: self.execute(job[0], job[1], **job[2]), jobs))
+
+    def _fetch_once(self, cache_key: str, fetch: Callable[[], Any], **cache_options) -> Any:
+        """
+        Runs a fetch at most once per cache key at a time and caches its result.
+
+        The in-flight queries are tracked by the shared cache, so a query already running for any
+        tool instance is awaited instead of being issued again.
+
+        Args:
+            cache_key (str): The key the result is cached under.
+            fetch (Callable[[], Any]): Performs the actual query.
+            **cache_options: Passed to the cache's get_or_fetch(), e.g. expire.
+
+        Returns:
+            Any: The fetched (or concurrently fetched, or already cached) result.
+        """
+        return self._cache.get_or_fetch(cache_key, fetch, **cache_options)
+
+    def _get_refreshing(self, cache_key: str, fetch: Callable[[], Any], expire: float) -> Any:
+        """
+        Returns the cached value for the key, refreshing it in the background when it is about to expire.
+
+        A read in the last REFRESH_AHEAD of the entry's lifetime still returns the cached value
+        immediately, and submits at most one refresh per key, so hot keys never pay the round trip.
+
+        Args:
+            cache_key (str): The key the result is cached under.
+            fetch (Callable[[], Any]): Performs the actual query.
+            expire (float): Seconds the refreshed entry stays valid.
+
+        Returns:
+            Any: The cached value, or None on a miss.
+        """
+        entry = self._cache.get_entry(cache_key)
+        if entry is None:
+            return None
+
+        value, expire_time = entry
+        if expire_time - time.time() < REFRESH_AHEAD * expire:
+            with _refreshing_lock:
+                submit = cache_key not in _refreshing
+                _refreshing.add(cache_key)
+            if submit:
+                _refresh_pool.submit(self._refresh, cache_key, fetch, expire)
+        return value
+
+    def _refresh(self, cache_key: str, fetch: Callable[[], Any], expire: float):
+        """Re-runs a fetch for _get_refreshing() and replaces the cached entry with its result."""
+        try:
+            self._cache.set(cache_key, fetch(), expire=expire)
+        except Exception as e:
+            # The old entry is still served until it expires; the next read after that refetches
+            self.logger.warning(f"Background refresh of {cache_key} failed: {str(e)}")
+        finally:
+            with _refreshing_lock:
+                _refreshing.discard(cache_key)
+
     def log_operation(self, operation: str, details: Dict[str, Any]):
         """Log security tool operations"""
-        self.logger.info(f"{operation}: {details}")
\ No newline at end of file
+        # Let logging format the details only if the record is actually emitted
+        self.logger.log(logging.INFO, "%s: %s", operation, details)
\ No newline at end of file
@@ -0,0 +1,389 @@
+# core/cache.py
+import json
+import logging
+import os
+import pickle
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import Future
+from datetime import date, datetime
+from threading import Event, Lock, RLock, Thread
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from cachetools import TLRUCache
+
+CACHE_DIR = "~/.cache/pycybersec"  # Overridden by the SECTK_CACHE environment variable
+DEFAULT_EXPIRE = 3600  # seconds
+MEMORY_MAXSIZE = 10_000  # entries
+DISK_SIZE_LIMIT = 256 * 1024 * 1024  # bytes
+REDIS_KEY_PREFIX = "sectk:"
+REDIS_LOCK_EXPIRE = 60  # seconds a key's fetch lock outlives its worker; renewed while the fetch runs
+REDIS_POLL_INTERVAL = 0.1  # seconds between checks while another worker fetches a key
+# Marks JSON objects in Redis that stand for a type JSON has no literal for (tuple, datetime, ...)
+JSON_TYPE_TAG = "__sectk_type__"
+
+logger = logging.getLogger(__name__)
+
+_cache: Optional["Cache"] = None
+# Guards the creation of _cache, so concurrent first callers cannot each build their own
+_cache_lock = Lock()
+
+# A cache entry: the value and the absolute time (time.time()) at which it expires
+Entry = Tuple[Any, float]
+
+
+def _entry_expiry(key, entry, now):
+    """Time-to-use function for TLRUCache: every in-memory entry carries its own expiry timestamp."""
+    return entry[1]
+
+
+def _expire_time(expire: Optional[float]) -> float:
+    """Converts a TTL in seconds into an absolute expiry timestamp."""
+    return time.time() + expire if expire is not None else float("inf")
+
+
+def _to_json(value: Any) -> Any:
+    """
+    Converts a cached value into plain JSON types, tagging the types JSON cannot represent.
+
+    Raises:
+        TypeError: If the value contains an object of any other type.
+    """
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, list):
+        return [_to_json(item) for item in value]
+    if isinstance(value, tuple):
+        return {JSON_TYPE_TAG: "tuple", "items": [_to_json(item) for item in value]}
+    if isinstance(value, (set, frozenset)):
+        return {JSON_TYPE_TAG: "set", "items": [_to_json(item) for item in value]}
+    if isinstance(value, datetime):
+        return {JSON_TYPE_TAG: "datetime", "value": value.isoformat()}
+    if isinstance(value, date):
+        return {JSON_TYPE_TAG: "date", "value": value.isoformat()}
+    if isinstance(value, dict):
+        if all(isinstance(key, str) for key in value) and JSON_TYPE_TAG not in value:
+            return {key: _to_json(item) for key, item in value.items()}
+        # Keys JSON objects cannot hold (ints, tuples) or that would read back as a tag
+        return {JSON_TYPE_TAG: "dict", "items": [[_to_json(key), _to_json(item)] for key, item in value.items()]}
+    raise TypeError(f"{type(value).__name__} values are not stored in Redis")
+
+
+def _from_json_object(obj: Dict[str, Any]) -> Any:
+    """json.loads() object hook that turns the objects tagged by _to_json() back into their types."""
+    kind = obj.get(JSON_TYPE_TAG)
+    if kind is None:
+        return obj
+    if kind == "tuple":
+        return tuple(obj["items"])
+    if kind == "set":
+        return set(obj["items"])
+    if kind == "datetime":
+        return datetime.fromisoformat(obj["value"])
+    if kind == "date":
+        return date.fromisoformat(obj["value"])
+    if kind == "dict":
+        return {key: item for key, item in obj["items"]}
+    raise ValueError(f"unknown type tag {kind!r}")
+
+
+class Cache(ABC):
+    """
+    Base class for the caches shared by all security tools.
+
+    Backends only store and look up entries. Coalescing concurrent identical queries is implemented
+    here, so it works the same whichever backend is configured.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[str, Future] = {}  # Queries currently being fetched, by key
+        self._inflight_lock = Lock()
+
+    @abstractmethod
+    def get_entry(self, key: str) -> Optional[Entry]:
+        """
+        Returns the (value, expire_time) entry for the key, or None if it is missing or expired.
+
+        Args:
+            key (str): The cache key, in the form "<tool>:<operation>:<target>".
+        """
+
+    @abstractmethod
+    def set(self, key: str, value, expire: Optional[float] = DEFAULT_EXPIRE) -> bool:
+        """
+        Stores a value in the cache.
+
+        Args:
+            key (str): The cache key, in the form "<tool>:<operation>:<target>".
+            value (Any): The value to store.
+            expire (float): Seconds until the entry expires, or None to keep it until evicted.
+
+        Returns:
+            bool: True if the value was stored.
+        """
+
+    def get(self, key: str, default=None):
+        """
+        Returns the cached value for the key, or the default if it is missing or expired.
+
+        Args:
+            key (str): The cache key, in the form "<tool>:<operation>:<target>".
+            default (Any): The value to return on a miss.
+        """
+        entry = self.get_entry(key)
+        return default if entry is None else entry[0]
+
+    def get_or_fetch(self, key: str, fetch: Callable[[], Any], expire: Optional[float] = DEFAULT_EXPIRE) -> Any:
+        """
+        Returns the cached value for the key, running the fetch at most once at a time on a miss.
+
+        The first caller for a missing key performs the fetch; callers that arrive while it is in
+        flight wait for its Future instead of issuing the same expensive query again. Futures are
+        kept apart from the stored entries because they cannot be serialized.
+
+        Args:
+            key (str): The cache key, in the form "<tool>:<operation>:<target>".
+            fetch (Callable[[], Any]): Performs the actual query.
+            expire (float): Seconds until the fetched entry expires.
+
+        Returns:
+            Any: The cached, fetched or concurrently fetched value.
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        # Only the in-flight bookkeeping is locked; backend reads stay outside so misses run in parallel
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = self._inflight[key] = Future()
+
+        if not leader:
+            return future.result()
+
+        try:
+            # A previous leader may have stored the value between the read above and taking the key
+            value = self.get(key)
+            if value is None:
+                value = self._fetch_and_set(key, fetch, expire)
+            future.set_result(value)
+            return value
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+
+    def _fetch_and_set(self, key: str, fetch: Callable[[], Any], expire: Optional[float]) -> Any:
+        """Runs the fetch for get_or_fetch() and stores its result before the key is released."""
+        value = fetch()
+        # Store before releasing the key so late callers find the value instead of refetching
+        self.set(key, value, expire=expire)
+        return value
+
+
+class MemoryCache(Cache):
+    """Bounded in-process cache; the least recently used entries are evicted first."""
+
+    def __init__(self, maxsize: int = MEMORY_MAXSIZE):
+        super().__init__()
+        self._memory = TLRUCache(maxsize=maxsize, ttu=_entry_expiry, timer=time.time)
+        self._lock = RLock()
+
+    def get_entry(self, key: str) -> Optional[Entry]:
+        with self._lock:
+            return self._memory.get(key)
+
+    def set(self, key: str, value, expire: Optional[float] = DEFAULT_EXPIRE) -> bool:
+        self.set_entry(key, (value, _expire_time(expire)))
+        return True
+
+    def set_entry(self, key: str, entry: Entry):
+        """Stores an entry that already carries its expiry timestamp."""
+        with self._lock:
+            self._memory[key] = entry
+
+
+class DiskCache(Cache):
+    """Size-limited on-disk cache, so results survive across runs and are shared between processes."""
+
+    def __init__(self, directory: str, size_limit: int = DISK_SIZE_LIMIT):
+        super().__init__()
+        from diskcache import Cache as DiskStore
+        self._disk = DiskStore(directory, size_limit=size_limit)
+
+    def get_entry(self, key: str) -> Optional[Entry]:
+        value, expire_time = self._disk.get(key, default=None, expire_time=True)
+        if value is None:
+            return None
+        return value, expire_time if expire_time is not None else float("inf")
+
+    def set(self, key: str, value, expire: Optional[float] = DEFAULT_EXPIRE) -> bool:
+        try:
+            return self._disk.set(key, value, expire=expire)
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            logger.warning(f"Not caching {key} on disk: {str(e)}")
+            return False
+
+
+class RedisCache(Cache):
+    """
+    Cache stored in Redis, so every process and every machine pointed at the server shares results.
+
+    Values are stored as JSON rather than pickles, so whoever can write to the server can plant
+    bad data but cannot run code in the processes that read it. Values that JSON cannot represent
+    are kept in the memory tier only.
+
+    Concurrent fetches of the same key are also coalesced across processes: the worker that wins
+    the key's lock performs the query while the others poll for its result. The lock holds a token
+    unique to its owner and is renewed for as long as the fetch runs, so a slow fetch (a port scan,
+    a dork run) is never repeated by another worker, and only its owner can release it.
+    """
+
+    def __init__(self, url: str):
+        super().__init__()
+        import redis
+        self._redis = redis.Redis.from_url(url)
+
+    def get_entry(self, key: str) -> Optional[Entry]:
+        pipe = self._redis.pipeline()
+        pipe.get(REDIS_KEY_PREFIX + key)
+        pipe.pttl(REDIS_KEY_PREFIX + key)
+        raw, ttl_ms = pipe.execute()
+        if raw is None:
+            return None
+        try:
+            value = json.loads(raw, object_hook=_from_json_object)
+        except (ValueError, KeyError, TypeError) as e:
+            # Written by something other than this class (or an older, pickling version): a miss
+            logger.warning(f"Ignoring unreadable Redis entry {key}: {str(e)}")
+            return None
+        # PTTL is -1 for keys stored without an expiry
+        expire_time = time.time() + ttl_ms / 1000 if ttl_ms >= 0 else float("inf")
+        return value, expire_time
+
+    def set(self, key: str, value, expire: Optional[float] = DEFAULT_EXPIRE) -> bool:
+        try:
+            raw = json.dumps(_to_json(value), separators=(",", ":"))
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Not caching {key} in Redis: {str(e)}")
+            return False
+        px = int(expire * 1000) if expire is not None else None
+        return bool(self._redis.set(REDIS_KEY_PREFIX + key, raw, px=px))
+
+    def _fetch_and_set(self, key: str, fetch: Callable[[], Any], expire: Optional[float]) -> Any:
+        from redis.exceptions import LockError
+
+        # SET NX with a random token; released by a compare-and-delete script. Not thread-local, so
+        # the renewal thread can extend it.
+        lock = self._redis.lock(f"{REDIS_KEY_PREFIX}lock:{key}", timeout=REDIS_LOCK_EXPIRE, thread_local=False)
+
+        # Wait while another worker holds the fetch lock; if it dies, the lock expires on its own
+        while not lock.acquire(blocking=False):
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+            time.sleep(REDIS_POLL_INTERVAL)
+
+        done = Event()
+        renewer = Thread(target=self._renew_lock, args=(lock, done), name="redis-cache-lock", daemon=True)
+        renewer.start()
+        try:
+            # The previous lock holder may have stored the value just before we took over
+            cached = self.get(key)
+            if cached is not None:
+                return cached
+            return super()._fetch_and_set(key, fetch, expire)
+        finally:
+            done.set()
+            renewer.join()
+            try:
+                lock.release()
+            except LockError:
+                # The lock expired and may belong to another worker now; the token check left it alone
+                logger.warning(f"Fetch lock for {key} was lost before the fetch finished")
+
+    @staticmethod
+    def _renew_lock(lock, done: Event):
+        """Resets the lock's expiry every third of REDIS_LOCK_EXPIRE until the fetch is done."""
+        from redis.exceptions import LockError
+
+        while not done.wait(REDIS_LOCK_EXPIRE / 3):
+            try:
+                lock.reacquire()
+            except LockError:
+                return
+
+
+class ToolCache(Cache):
+    """
+    Cache shared by all security tools.
+
+    A bounded in-memory tier sits in front of a shared backend (disk or Redis), so hot keys never
+    leave the process while results still survive across runs and processes. Every entry expires
+    after its own TTL in both tiers.
+    """
+
+    def __init__(self, backend: Cache, maxsize: int = MEMORY_MAXSIZE):
+        super().__init__()
+        self._memory = MemoryCache(maxsize)
+        self._backend = backend
+
+    def get_entry(self, key: str) -> Optional[Entry]:
+        entry = self._memory.get_entry(key)
+        if entry is not None:
+            return entry
+
+        entry = self._backend.get_entry(key)
+        if entry is not None:
+            # Promote the backend hit so the next lookup is served from memory
+            self._memory.set_entry(key, entry)
+        return entry
+
+    def set(self, key: str, value, expire: Optional[float] = DEFAULT_EXPIRE) -> bool:
+        """
+        Stores a value in both tiers.
+
+        Values the backend cannot serialize are kept in memory only, with a warning, instead of
+        failing the operation that produced them.
+
+        Returns:
+            bool: True if the value was also written to the backend.
+        """
+        self._memory.set(key, value, expire=expire)
+        return self._backend.set(key, value, expire=expire)
+
+    def _fetch_and_set(self, key: str, fetch: Callable[[], Any], expire: Optional[float]) -> Any:
+        # Let the backend coordinate with other processes, then keep the result in memory too
+        value = self._backend._fetch_and_set(key, fetch, expire)
+        self._memory.set(key, value, expire=expire)
+        return value
+
+
+def get_cache() -> Cache:
+    """
+    Returns the process-wide cache instance, creating it on first use.
+
+    The backend is chosen by $SECTK_CACHE_URL: a redis://, rediss:// or unix:// URL shares the
+    cache through Redis, memory:// keeps it in this process only, and by default it is stored on
+    disk in $SECTK_CACHE or CACHE_DIR.
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = _create_cache()
+    return _cache
+
+
+def _create_cache() -> Cache:
+    """Builds the cache for the backend configured in the environment."""
+    url = os.getenv("SECTK_CACHE_URL", "")
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return ToolCache(RedisCache(url))
+    if url == "memory://":
+        return MemoryCache()
+    return ToolCache(DiskCache(os.path.expanduser(os.getenv("SECTK_CACHE", CACHE_DIR))))
@@ -1,55 +1,52 @@
+import logging
 import os
-from typing import Optional
-import json
+from typing import ClassVar, Dict, List, Optional, Union
 
-from dotenv import load_dotenv
-from censys.search import CensysHosts
 from .base import SecurityTool, SecurityToolResult
 
 class CensysAnalyzer(SecurityTool):
     """Class for interacting with Censys API to gather details about a target system."""
 
+    # Maps each supported operation to the name of the method that implements it
+    _OPS: ClassVar[Dict[str, str]] = {
+        'get_host_details': '_get_host_details',
+        'bulk_host_details': '_bulk_host_details',
+    }
+
     def __init__(self):
         """
         Initializes the CensysAnalyzer instance.
 
         Attributes:
             _api (CensysHosts): The Censys API client.
-            _cache (dict): A dictionary to cache the results of previous queries to improve performance.
         """
         super().__init__()
 
-        # Load environment variables from .env file
-        load_dotenv()
-
         # Retrieve the API key from environment variables (if required by Censys)
         api_key = os.getenv('CENSYS_API_KEY')
         if api_key is None:
             raise ValueError("Censys API key is missing in environment variables.")
+        from censys.search import CensysHosts
         self._api = CensysHosts()
-        self._cache = {}  # Simple cache to store results of previous queries
 
-    def execute(self, operation: str, target: str, **kwargs) -> SecurityToolResult:
+    def execute(self, operation: str, target: Union[str, List[str]], **kwargs) -> SecurityToolResult:
         """
         Executes an operation using the Censys API.
 
         Args:
-            operation (str): The operation to perform, in this case, 'host'.
-            target (str): The target (IP address) for the operation.
+            operation (str): The operation to perform, 'get_host_details' or 'bulk_host_details'.
+            target (str | list[str]): The target IP address, or a list of IP addresses for 'bulk_host_details'.
             **kwargs: Additional arguments for specific operations.
 
         Returns:
             SecurityToolResult: The result of the operation, either successful with data or failed with an error message.
         """
-        operations = {
-            'get_host_details': self._get_host_details,
-        }
-
-        if operation not in operations:
+        method_name = self._OPS.get(operation)
+        if method_name is None:
             return SecurityToolResult(False, None, f"Unsupported operation: {operation}")
 
         try:
-            result = operations[operation](target, **kwargs)
+            result = getattr(self, method_name)(target, **kwargs)
             return SecurityToolResult(True, result)
         except Exception as e:
             self.logger.error(f"Error in {operation}: {str(e)}")
@@ -68,17 +65,21 @@ class CensysAnalyzer(SecurityTool):
         Raises:
             Exception: If the Censys API query fails for the given IP address.
         """
-        cache_key = f"censys_{host}"
+        cache_key = f"{self.__class__.__name__}:get_host_details:{host}"
 
         # Check cache first to avoid redundant queries
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         try:
-            ipinfo = self._api.view(host)
+            # Concurrent callers for the same host share one API request
+            ipinfo = self._fetch_once(cache_key, lambda: self._api.view(host))
 
-            self._cache[cache_key] = ipinfo
-            self.log_operation("censys", {"ip": host, "info": json.dumps(ipinfo, indent=4)})
+            # Serializing the full host record is only worth it when INFO records are emitted
+            if self.logger.isEnabledFor(logging.INFO):
+                import orjson
+                self.log_operation("censys", {"ip": host, "info": orjson.dumps(ipinfo, default=str).decode()})
 
             # Print specific details of the host like services, ports, and banners
             if 'services' in ipinfo:
@@ -91,4 +92,41 @@ class CensysAnalyzer(SecurityTool):
         except Exception as e:
             raise Exception(f"Censys query failed for {host}: {str(e)}")
 
+    def _bulk_host_details(self, hosts: List[str]) -> Dict[str, dict]:
+        """
+        Fetches detailed information about several IP addresses from Censys in one batch.
+
+        Hosts that are already cached are served from the cache; the rest are requested together
+        through the client's bulk view, which reuses one HTTP session for all of them.
 
+        Args:
+            hosts (list[str]): The IP addresses to retrieve details for.
+
+        Returns:
+            Dict[str, dict]: The Censys information keyed by IP address.
+
+        Raises:
+            Exception: If the Censys bulk query fails.
+        """
+        results = {}
+        uncached = []
+
+        for host in dict.fromkeys(hosts):
+            cached = self._cache.get(f"{self.__class__.__name__}:get_host_details:{host}")
+            if cached is not None:
+                results[host] = cached
+            else:
+                uncached.append(host)
+
+        if uncached:
+            try:
+                fetched = self._api.bulk_view(uncached)
+            except Exception as e:
+                raise Exception(f"Censys bulk query failed for {', '.join(uncached)}: {str(e)}")
+
+            for host, ipinfo in fetched.items():
+                self._cache.set(f"{self.__class__.__name__}:get_host_details:{host}", ipinfo)
+                results[host] = ipinfo
+            self.log_operation("censys_bulk", {"ips": uncached})
+
+        return {host: results[host] for host in dict.fromkeys(hosts) if host in results}
@@ -1,59 +1,71 @@
 import os
-import json
-from typing import Optional
+from typing import ClassVar, Dict, List, Union
 
-from dotenv import load_dotenv
-from pycrtsh import Crtsh
 from .base import SecurityTool, SecurityToolResult
 
+CRTSH_URL = "https://crt.sh/"
+
 
 class CrtshAnalyzer(SecurityTool):
     """Class for interacting with crt.sh API to gather certificate information about a domain."""
 
-    def __init__(self):
-        """
-        Initializes the CrtshAnalyzer instance.
-
-        Attributes:
-            _crtsh (Crtsh): The Crtsh API client.
-            _cache (dict): A dictionary to cache the results of previous queries to improve performance.
-        """
-        super().__init__()
-
-        # Завантажуємо змінні середовища з .env файлу
-        load_dotenv()
-
-        # Ініціалізація Crtsh API клієнта
-        self._crtsh = Crtsh()
-        self._cache = {}  # Simple cache to store results of previous queries
+    # Maps each supported operation to the name of the method that implements it
+    _OPS: ClassVar[Dict[str, str]] = {
+        'cert_query': '_cert_query',
+        'bulk_cert_query': '_bulk_cert_query',
+    }
 
-    def execute(self, operation: str, target: str, **kwargs) -> SecurityToolResult:
+    def execute(self, operation: str, target: Union[str, List[str]], **kwargs) -> SecurityToolResult:
         """
         Executes an operation using the Crtsh API.
 
         Args:
-            operation (str): The operation to perform, in this case, 'cert_query'.
-            target (str): The target domain for the operation.
+            operation (str): The operation to perform, 'cert_query' or 'bulk_cert_query'.
+            target (str | list[str]): The target domain, or a list of domains for 'bulk_cert_query'.
             **kwargs: Additional arguments for specific operations.
 
         Returns:
             SecurityToolResult: The result of the operation, either successful with data or failed with an error message.
         """
-        operations = {
-            'cert_query': self._cert_query,
-        }
-
-        if operation not in operations:
+        method_name = self._OPS.get(operation)
+        if method_name is None:
             return SecurityToolResult(False, None, f"Unsupported operation: {operation}")
 
         try:
-            result = operations[operation](target, **kwargs)
+            result = getattr(self, method_name)(target, **kwargs)
             return SecurityToolResult(True, result)
         except Exception as e:
             self.logger.error(f"Error in {operation}: {str(e)}")
             return SecurityToolResult(False, None, str(e))
 
-    def _cert_query(self, host: str) -> Optional[dict]:
+    async def _acert_query(self, host: str) -> List[dict]:
+        """
+        Fetches the certificates for the domain and its subdomains from the crt.sh JSON endpoint.
+
+        The response is parsed incrementally as it streams in, so the raw body is never held in
+        memory alongside the decoded records.
+
+        Args:
+            host (str): The domain to search for certificates.
+
+        Returns:
+            List[dict]: The certificate records returned by crt.sh.
+        """
+        import ijson
+        from .http import get_client
+
+        certs = ijson.sendable_list()
+        parser = ijson.items_coro(certs, "item", use_float=True)
+
+        async with get_client().stream("GET", CRTSH_URL, params={"q": f"%.{host}", "output": "json"}) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes():
+                parser.send(chunk)
+        parser.close()
+
+        return list(certs)
+
+    def _cert_query(self, host: str) -> List[dict]:
         """
         Perform a crt.sh certificate lookup for the target domain.
 
@@ -61,26 +73,66 @@ class CrtshAnalyzer(SecurityTool):
             host (str): The domain to search for certificates.
 
         Returns:
-            Optional[dict]: A dictionary containing the certificates information for the given domain.
+            List[dict]: The certificate records for the given domain.
 
         Raises:
             Exception: If the Crtsh API query fails for the given domain.
         """
-        cache_key = f"crtsh_{host}"
+        cache_key = f"{self.__class__.__name__}:cert_query:{host}"
 
         # Check cache first to avoid redundant queries
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         try:
-            certs = self._crtsh.search(host)
-
-            # Caching the result
-            self._cache[cache_key] = certs
+            # Concurrent callers for the same domain share one request
+            from .http import run
+            certs = self._fetch_once(cache_key, lambda: run(self._acert_query(host)))
 
             # Log operation
-            self.log_operation("crtsh", {"host": host, "certificates": json.dumps(certs, indent=4, default=str)})
+            self.log_operation("crtsh", {"host": host, "certificates": len(certs)})
 
             return certs
         except Exception as e:
             raise Exception(f"Crtsh query failed for {host}: {str(e)}")
+
+    def _bulk_cert_query(self, hosts: List[str]) -> Dict[str, List[dict]]:
+        """
+        Perform crt.sh certificate lookups for several domains concurrently.
+
+        Cached domains are served from the cache; the rest are requested at the same time over the
+        shared HTTP/2 connection.
+
+        Args:
+            hosts (list[str]): The domains to search for certificates.
+
+        Returns:
+            Dict[str, List[dict]]: The certificate records keyed by domain.
+
+        Raises:
+            Exception: If any of the Crtsh API queries fails.
+        """
+        results = {}
+        uncached = []
+
+        for host in dict.fromkeys(hosts):
+            cached = self._cache.get(f"{self.__class__.__name__}:cert_query:{host}")
+            if cached is not None:
+                results[host] = cached
+            else:
+                uncached.append(host)
+
+        if uncached:
+            try:
+                from .http import run_all
+                fetched = run_all([self._acert_query(host) for host in uncached])
+            except Exception as e:
+                raise Exception(f"Crtsh bulk query failed for {', '.join(uncached)}: {str(e)}")
+
+            for host, certs in zip(uncached, fetched):
+                self._cache.set(f"{self.__class__.__name__}:cert_query:{host}", certs)
+                results[host] = certs
+            self.log_operation("crtsh_bulk", {"hosts": uncached})
+
+        return {host: results[host] for host in dict.fromkeys(hosts)}
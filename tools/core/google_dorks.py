@@ -1,18 +1,68 @@
-from typing import Optional
+import re
+from functools import lru_cache
+from typing import ClassVar, Dict, List, Optional
+from urllib.parse import unquote
 
-from googlesearch import search
-
-from pagodo.pagodo import Pagodo
 from .base import SecurityTool, SecurityToolResult
 
+GOOGLE_SEARCH_URL = "https://www.google.com/search"
+# The basic (non-JavaScript) results page links every hit through /url?q=<target>&...
+_REDIRECT_TARGET_RE = re.compile(r"^/url\?q=([^&]+)")
+DORKS_EXPIRE = 24 * 3600  # seconds; a full dork run takes minutes of rate-limited searching
+
+
+@lru_cache(maxsize=8)
+def _get_pagodo(google_dorks_file: str, domain: str):
+    """
+    Returns a Pagodo instance for the dorks file and domain, building it only once.
+
+    Pagodo reads and parses the dorks file and sets up its search session on construction, so
+    reusing the instance skips that work on every later run.
+    """
+    from pagodo.pagodo import Pagodo
+    return Pagodo(
+        google_dorks_file=google_dorks_file,
+        domain=domain,
+        max_search_result_urls_to_return_per_dork=3,
+        save_pagodo_results_to_json_file=True,
+        minimum_delay_between_dork_searches_in_seconds=10,
+        maximum_delay_between_dork_searches_in_seconds=15,
+        save_urls_to_file=True,
+        verbosity=4
+    )
+
+
+def _parse_serp(html: bytes) -> List[str]:
+    """
+    Extracts the result URLs from a Google results page.
+
+    Args:
+        html (bytes): The raw results page.
+
+    Returns:
+        List[str]: The unique result URLs, in page order.
+    """
+    from selectolax.parser import HTMLParser
+
+    urls = []
+    for node in HTMLParser(html).css("a[href^='/url?q=']"):
+        match = _REDIRECT_TARGET_RE.match(node.attributes.get("href") or "")
+        if match is None:
+            continue
+        url = unquote(match.group(1))
+        if url.startswith("http") and url not in urls:
+            urls.append(url)
+    return urls
+
+
 class GoogleDorks(SecurityTool):
     """Class for processing Google Dorks using Pagodo to get vulnerabilities/exploit information."""
 
-    def __init__(self):
-        """
-        Initializes the GoogleDorks instance.
-        """
-        super().__init__()
+    # Maps each supported operation to the name of the method that implements it
+    _OPS: ClassVar[Dict[str, str]] = {
+        'process_dorks': '_process_dorks',
+        'process_search': '_perform_google_search',
+    }
 
     def execute(self, operation: str, domain: str, **kwargs) -> SecurityToolResult:
         """
@@ -27,21 +77,38 @@ class GoogleDorks(SecurityTool):
         Returns:
             SecurityToolResult: The result of the dork processing operation, either successful with data or failed with an error message.
         """
-        operations = {
-            'process_dorks': self._process_dorks,
-            'process_search': self._perform_google_search,
-        }
-
-        if operation not in operations:
+        method_name = self._OPS.get(operation)
+        if method_name is None:
             return SecurityToolResult(False, None, f"Unsupported operation: {operation}")
 
         try:
-            result = operations[operation](domain, **kwargs)
+            result = getattr(self, method_name)(domain, **kwargs)
             return SecurityToolResult(True, result)
         except Exception as e:
             self.logger.error(f"Error in {operation}: {str(e)}")
             return SecurityToolResult(False, None, str(e))
 
+    async def _agoogle_search(self, query: str, stop: int = 5) -> List[str]:
+        """
+        Fetches a Google results page for the query and extracts the result URLs.
+
+        Args:
+            query (str): The full search query.
+            stop (int): The maximum number of URLs to return.
+
+        Returns:
+            List[str]: The result URLs, in page order.
+        """
+        from .http import get_client
+        response = await get_client().get(
+            GOOGLE_SEARCH_URL,
+            params={"q": query, "num": stop, "hl": "en"},
+            headers={"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"},
+        )
+        response.raise_for_status()
+
+        return _parse_serp(response.content)[:stop]
+
     def _perform_google_search(self, host, **kwargs):
         """
         Perform google search using the host and query string.
@@ -50,10 +117,17 @@ class GoogleDorks(SecurityTool):
             host (string): Target system
             query_string (String): Query string
         """
-        result = []
-        for query in search(host + " " + kwargs['query_string'], stop=5):
-            result.append(query)
-        return result
+        query = host + " " + kwargs['query_string']
+        cache_key = f"{self.__class__.__name__}:process_search:{query}"
+
+        # Check cache first to avoid redundant queries
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        from .http import run
+        return self._fetch_once(cache_key, lambda: run(self._agoogle_search(query, stop=5)))
+
     def _process_dorks(self, domain: str, **kwargs) -> str:
         """
         Processes Google Dorks using Pagodo to get vulnerabilities/exploit information.
@@ -65,23 +139,24 @@ class GoogleDorks(SecurityTool):
         Returns:
             str: Formatted string with dorks and their associated URLs.
         """
-        pg = Pagodo(
-            google_dorks_file='dorks.txt',
-            domain=domain,
-            max_search_result_urls_to_return_per_dork=3,
-            save_pagodo_results_to_json_file=True,
-            minimum_delay_between_dork_searches_in_seconds=10,
-            maximum_delay_between_dork_searches_in_seconds=15,
-            save_urls_to_file=True,
-            verbosity=4
-        )
+        google_dorks_file = kwargs.get('google_dorks_file', 'dorks.txt')
+        cache_key = f"{self.__class__.__name__}:process_dorks:{google_dorks_file}:{domain}"
+
+        # Check cache first to avoid redundant queries
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        return self._fetch_once(cache_key, lambda: self._run_dorks(google_dorks_file, domain), expire=DORKS_EXPIRE)
 
-        pagodo_results_dict = pg.go()
+    def _run_dorks(self, google_dorks_file: str, domain: str) -> str:
+        """Runs Pagodo for _process_dorks and formats the dorks with their URLs."""
+        pagodo_results_dict = _get_pagodo(google_dorks_file, domain).go()
 
-        result = ""
+        parts = []
         for key, value in pagodo_results_dict["dorks"].items():
-            result += f"dork: {key}\n"
+            parts.append(f"dork: {key}\n")
             for url in value["urls"]:
-                result += f"{url}\n"
+                parts.append(f"{url}\n")
 
-        return result
+        return "".join(parts)
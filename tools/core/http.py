@@ -0,0 +1,89 @@
+# core/http.py
+import asyncio
+import sys
+import threading
+from functools import lru_cache
+from typing import Any, Awaitable, List, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_client: Optional[httpx.AsyncClient] = None
+# Guards the creation of _loop and _client, so concurrent first callers cannot each build their own
+_init_lock = threading.Lock()
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    """Returns the background event loop that every async HTTP request runs on, starting it on first use."""
+    global _loop
+    if _loop is None:
+        with _init_lock:
+            if _loop is None:
+                _loop = _start_loop()
+    return _loop
+
+
+def _start_loop() -> asyncio.AbstractEventLoop:
+    """Creates the background event loop and starts it in a daemon thread."""
+    loop = None
+    if sys.platform != "win32":
+        try:
+            # libuv-based loop: cheaper polling and callback dispatch than the default selector loop
+            import uvloop
+            loop = uvloop.new_event_loop()
+        except ImportError:
+            pass
+    if loop is None:
+        loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, name="security-toolkit-http", daemon=True).start()
+    return loop
+
+
+def get_client() -> httpx.AsyncClient:
+    """
+    Returns the process-wide HTTP/2 client.
+
+    The client keeps its connections alive between calls, so it must only be used from coroutines
+    passed to run() or run_all(), which all execute on the same background loop.
+    """
+    global _client
+    if _client is None:
+        with _init_lock:
+            if _client is None:
+                _client = httpx.AsyncClient(
+                    http2=True,
+                    timeout=10.0,
+                    follow_redirects=True,
+                    limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+                )
+    return _client
+
+
+@lru_cache(maxsize=1)
+def get_session() -> requests.Session:
+    """
+    Returns the process-wide session for API clients that are built on requests.
+
+    The pool is sized for the toolkit's I/O thread pool, so concurrent lookups reuse kept-alive
+    TLS connections instead of opening a new one whenever more than requests' default of 10 are busy.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=64)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def run(coro: Awaitable) -> Any:
+    """Runs a coroutine on the background loop and blocks until it completes."""
+    return asyncio.run_coroutine_threadsafe(coro, _get_loop()).result()
+
+
+def run_all(coros: List[Awaitable]) -> List[Any]:
+    """Runs several coroutines concurrently on the background loop and returns their results in order."""
+    async def gather():
+        return await asyncio.gather(*coros)
+
+    return run(gather())
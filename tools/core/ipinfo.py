@@ -1,55 +1,66 @@
+import logging
 import os
-import json
-from typing import Optional
-from dotenv import load_dotenv
-import ipinfo
+from functools import cached_property, lru_cache
+from typing import ClassVar, Dict, List, Optional, Union
 
 from .base import SecurityTool, SecurityToolResult
 
-class IpinfoAnalyzer(SecurityTool):
-    """Class for interacting with IPInfo API to gather details about a target IP address."""
+# Geolocation data changes slowly and every lookup costs API quota, so keep results for a day
+HOST_EXPIRE = 86400
 
-    def __init__(self):
-        """
-        Initializes the IpinfoAnalyzer instance.
 
-        Attributes:
-            _handler (ipinfo.Handler): The IPInfo API client.
-            _cache (dict): A dictionary to cache the results of previous queries to improve performance.
-        """
-        super().__init__()
+@lru_cache(maxsize=1)
+def _get_handler(access_token: str):
+    """Returns the IPInfo client for the access token, shared by every IpinfoAnalyzer instance."""
+    import ipinfo
+    return ipinfo.getHandler(access_token)
+
+
+def _select_fields(data: dict) -> dict:
+    """Keeps the IPInfo fields the toolkit reports."""
+    return {
+        'city': data.get('city'),
+        'country': data.get('country'),
+        'timezone': data.get('timezone'),
+    }
 
-        # Завантажуємо змінні середовища з .env файлу
-        load_dotenv()
 
+class IpinfoAnalyzer(SecurityTool):
+    """Class for interacting with IPInfo API to gather details about a target IP address."""
+
+    # Maps each supported operation to the name of the method that implements it
+    _OPS: ClassVar[Dict[str, str]] = {
+        'get_host_details': '_get_host_details',
+        'get_host_details_batch': '_get_host_details_batch',
+    }
+
+    @cached_property
+    def _handler(self):
+        """The IPInfo API client, created on first use."""
         # Отримуємо Access Token із середовища
         access_token = os.getenv('IPINFO_ACCESS_TOKEN')
         if access_token is None:
             raise ValueError("IPInfo Access Token is missing in environment variables.")
-        self._handler = ipinfo.getHandler(access_token)
-        self._cache = {}  # Simple cache to store results of previous queries
+        return _get_handler(access_token)
 
-    def execute(self, operation: str, target: str, **kwargs) -> SecurityToolResult:
+    def execute(self, operation: str, target: Union[str, List[str]], **kwargs) -> SecurityToolResult:
         """
         Executes an operation using the IPInfo API.
 
         Args:
-            operation (str): The operation to perform, in this case, 'get_host_details'.
-            target (str): The target (IP address) for the operation.
+            operation (str): The operation to perform, 'get_host_details' or 'get_host_details_batch'.
+            target (str | list[str]): The target IP address, or a list of IP addresses for 'get_host_details_batch'.
             **kwargs: Additional arguments for specific operations.
 
         Returns:
             SecurityToolResult: The result of the operation, either successful with data or failed with an error message.
         """
-        operations = {
-            'get_host_details': self._get_host_details,
-        }
-
-        if operation not in operations:
+        method_name = self._OPS.get(operation)
+        if method_name is None:
             return SecurityToolResult(False, None, f"Unsupported operation: {operation}")
 
         try:
-            result = operations[operation](target, **kwargs)
+            result = getattr(self, method_name)(target, **kwargs)
             return SecurityToolResult(True, result)
         except Exception as e:
             self.logger.error(f"Error in {operation}: {str(e)}")
@@ -68,25 +79,67 @@ class IpinfoAnalyzer(SecurityTool):
         Raises:
             Exception: If the IPInfo API query fails for the given IP address.
         """
-        cache_key = f"ipinfo_{host}"
+        cache_key = f"{self.__class__.__name__}:get_host_details:{host}"
 
         # Check cache first to avoid redundant queries
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         try:
-            ipinfo_details = self._handler.getDetails(host)
-            # Convert to JSON-like structure for easier parsing
-            json_data = json.loads(json.dumps(ipinfo_details.all, indent=4))
-
-            details = {
-                'city': json_data.get('city'),
-                'country': json_data.get('country'),
-                'timezone': json_data.get('timezone'),
-            }
-
-            self._cache[cache_key] = details
-            self.log_operation("ipinfo", {"ip": host, "info": json.dumps(details, indent=4)})
+            # Concurrent callers for the same IP share one API request
+            details = self._fetch_once(cache_key, lambda: self._fetch_host_details(host), expire=HOST_EXPIRE)
+            if self.logger.isEnabledFor(logging.INFO):
+                import orjson
+                self.log_operation("ipinfo", {"ip": host, "info": orjson.dumps(details).decode()})
             return details
         except Exception as e:
             raise Exception(f"IPInfo query failed for {host}: {str(e)}")
+
+    def _fetch_host_details(self, host: str) -> dict:
+        """Queries IPInfo for _get_host_details and keeps the fields the toolkit reports."""
+        ipinfo_details = self._handler.getDetails(host)
+        # .all is already a plain dict, and _select_fields only reads from it
+        return _select_fields(ipinfo_details.all)
+
+    def _get_host_details_batch(self, hosts: List[str]) -> Dict[str, dict]:
+        """
+        Fetches details for several IP addresses through the IPInfo batch endpoint.
+
+        Cached addresses are served from the cache; the rest are sent in batches of up to 1000
+        addresses per request instead of one request each.
+
+        Args:
+            hosts (list[str]): The IP addresses to retrieve details for.
+
+        Returns:
+            Dict[str, dict]: The IPInfo information keyed by IP address.
+
+        Raises:
+            Exception: If the IPInfo batch query fails.
+        """
+        results = {}
+        uncached = []
+
+        for host in dict.fromkeys(hosts):
+            cached = self._cache.get(f"{self.__class__.__name__}:get_host_details:{host}")
+            if cached is not None:
+                results[host] = cached
+            else:
+                uncached.append(host)
+
+        if uncached:
+            try:
+                batch = self._handler.getBatchDetails(uncached, batch_size=1000)
+            except Exception as e:
+                raise Exception(f"IPInfo batch query failed for {', '.join(uncached)}: {str(e)}")
+
+            for host in uncached:
+                if host not in batch:
+                    continue
+                details = _select_fields(batch[host])
+                self._cache.set(f"{self.__class__.__name__}:get_host_details:{host}", details, expire=HOST_EXPIRE)
+                results[host] = details
+            self.log_operation("ipinfo_batch", {"ips": uncached})
+
+        return {host: results[host] for host in dict.fromkeys(hosts) if host in results}
@@ -1,23 +1,184 @@
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property, lru_cache
+from threading import Event, Lock
+from typing import Any, Callable, ClassVar, Dict, List, Optional, Tuple
+import ipaddress
+import os
 import socket
-import whois
-import pydig as pd
-from nslookup import Nslookup
+import time
+import zlib
 from .base import SecurityTool, SecurityToolResult
+from .whois_parser import is_no_match, normalize_whois, parse_refer, parse_whois
+
+# Cache lifetimes in seconds, following how often each kind of record changes
+DNS_EXPIRE = 300
+REVERSE_LOOKUP_EXPIRE = 900
+WHOIS_EXPIRE = 3600
+TIMEOUT_EXPIRE = 30  # a query that timed out fails fast for this long instead of being retried
+
+# Seconds to wait for each DNS attempt (overridden by SECTK_DNS_TIMEOUT), and attempts per query
+DNS_TIMEOUT = 2.0
+DNS_TRIES = 2
+
+# Upstream servers for the asynchronous c-ares resolver
+ASYNC_NAMESERVERS = ["1.1.1.1", "8.8.8.8"]
+# Public resolvers nslookup2 spreads domains across
+NSLOOKUP2_SERVERS = ["1.1.1.1", "8.8.8.8", "9.9.9.9", "208.67.222.222"]
+
+# The root WHOIS server; it refers each TLD to the registry server that holds its domains
+WHOIS_ROOT_SERVER = "whois.iana.org"
+WHOIS_PORT = 43
+WHOIS_TIMEOUT = 5  # seconds per connection, and for a whole WHOIS lookup
+WHOIS_MAX_RESPONSE = 1024 * 1024  # bytes; real replies are a few KiB
+
+# Minimum number of workers for blocking resolver calls; the pool grows to SECTK_IO_POOL if that is larger
+LOOKUP_POOL_MIN_WORKERS = 32
+
+_lookup_pool: Optional[ThreadPoolExecutor] = None
+_lookup_pool_lock = Lock()
+
+
+def _get_lookup_pool() -> ThreadPoolExecutor:
+    """
+    Returns the pool that runs the blocking resolver calls which cannot be given a timeout
+    themselves (getaddrinfo, gethostbyaddr).
+
+    It is created on first use, after .env has been loaded, with at least as many workers as the
+    toolkit's I/O pool, so every toolkit worker can have a lookup in progress.
+    """
+    global _lookup_pool
+    if _lookup_pool is None:
+        with _lookup_pool_lock:
+            if _lookup_pool is None:
+                workers = max(LOOKUP_POOL_MIN_WORKERS, int(os.getenv("SECTK_IO_POOL", "64")))
+                _lookup_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="network-lookup")
+    return _lookup_pool
+
+
+def _whois_query(server: str, query: str) -> str:
+    """
+    Sends one query to a WHOIS server and returns its whole response.
+
+    The read has to finish within WHOIS_TIMEOUT and WHOIS_MAX_RESPONSE bytes, so a server that
+    drips or streams its reply endlessly cannot hold the worker or its memory.
+
+    Raises:
+        OSError: If the connection fails, the deadline passes or the response is too large.
+    """
+    deadline = time.monotonic() + WHOIS_TIMEOUT
+    with socket.create_connection((server, WHOIS_PORT), timeout=WHOIS_TIMEOUT) as sock:
+        sock.sendall(f"{query}\r\n".encode())
+        chunks = []
+        size = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"{server} did not finish its response within {WHOIS_TIMEOUT}s")
+            sock.settimeout(remaining)
+            chunk = sock.recv(4096)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > WHOIS_MAX_RESPONSE:
+                raise OSError(f"{server} sent more than {WHOIS_MAX_RESPONSE} bytes")
+            chunks.append(chunk)
+    return b"".join(chunks).decode("utf-8", errors="replace")
+
+
+@lru_cache(maxsize=1024)
+def _whois_referral(tld: str) -> Optional[str]:
+    """
+    Returns the registry WHOIS server IANA refers the TLD to, or None if it has none.
+
+    Referrals almost never change, so each TLD is asked about once per process and every later
+    lookup in it needs a single connection.
+    """
+    return parse_refer(_whois_query(WHOIS_ROOT_SERVER, tld))
 
 
 class NetworkAnalyzer(SecurityTool):
     """Class for performing network-related security operations like DNS lookups, WHOIS queries, and DIG queries."""
 
+    # Maps each supported operation to the name of the method that implements it
+    _OPS: ClassVar[Dict[str, str]] = {
+        'nslookup': '_nslookup',
+        'whois': '_whois',
+        'dig': '_dig_info',  # Adding 'dig' operation
+        'nslookup2': '_nslookup2',
+        'nslookup_async': '_nslookup_ares',
+        'reverse_lookup': '_reverse_lookup',
+    }
+
     def __init__(self):
         """
-        Initializes the NetworkAnalyzer instance with an empty cache.
+        Initializes the NetworkAnalyzer instance.
 
         Attributes:
-            _cache (dict): A dictionary to cache the results of queries to improve performance.
+            _resolver (aiodns.DNSResolver): The asynchronous resolver, created on first use.
+            _dns_timeout (float): Seconds to wait for each DNS attempt.
         """
         super().__init__()
-        self._cache = {}  # Simple cache to store results of previous queries
+        self._resolver = None
+        self._dns_timeout = float(os.getenv("SECTK_DNS_TIMEOUT", DNS_TIMEOUT))
+
+    @cached_property
+    def _resolvers(self) -> list:
+        """One Nslookup resolver per server in NSLOOKUP2_SERVERS, created on first use."""
+        from nslookup import Nslookup
+        resolvers = [Nslookup(dns_servers=[server]) for server in NSLOOKUP2_SERVERS]
+        for resolver in resolvers:
+            resolver.dns_resolver.timeout = self._dns_timeout
+            resolver.dns_resolver.lifetime = self._dns_timeout * DNS_TRIES
+        return resolvers
+
+    @cached_property
+    def _dig_resolver(self):
+        """The pydig resolver, with dig's per-attempt timeout and retries capped."""
+        import pydig
+        return pydig.Resolver(additional_args=[f"+time={max(1, round(self._dns_timeout))}", f"+tries={DNS_TRIES}"])
+
+    def _call_with_timeout(self, cache_key: str, fn: Callable[[], Any], timeout: float) -> Any:
+        """
+        Runs a blocking lookup, giving up on it after the timeout.
+
+        The timeout counts from when a worker starts the lookup. A lookup still queued after the
+        timeout, because every worker is busy, is cancelled and reported as such. A lookup that
+        started and did not answer in time is remembered for TIMEOUT_EXPIRE seconds, during which
+        calls for the same key fail at once instead of tying up another worker on an unresponsive
+        upstream.
+
+        Args:
+            cache_key (str): The cache key of the lookup.
+            fn (Callable[[], Any]): Performs the lookup.
+            timeout (float): Seconds to wait for the lookup to start, and then for its answer.
+
+        Returns:
+            Any: The result of the lookup.
+
+        Raises:
+            TimeoutError: If the lookup did not finish in time, now or within the last TIMEOUT_EXPIRE
+                seconds, or could not start because the lookup pool is saturated.
+        """
+        timeout_key = f"{cache_key}:timed_out"
+        if self._cache.get(timeout_key):
+            raise TimeoutError(f"timed out less than {TIMEOUT_EXPIRE}s ago")
+
+        started = Event()
+
+        def run():
+            started.set()
+            return fn()
+
+        future = _get_lookup_pool().submit(run)
+        if not started.wait(timeout) and future.cancel():
+            # Nothing is known about this upstream yet, so the key is not marked as timed out
+            raise TimeoutError(f"not started within {timeout}s, all lookup workers are busy")
+
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            self._cache.set(timeout_key, True, expire=TIMEOUT_EXPIRE)
+            raise TimeoutError(f"no answer within {timeout}s")
 
     def execute(self, operation: str, target: str, **kwargs) -> SecurityToolResult:
         """
@@ -31,24 +192,39 @@ class NetworkAnalyzer(SecurityTool):
         Returns:
             SecurityToolResult: The result of the operation, either successful with data or failed with an error message.
         """
-        operations = {
-            'nslookup': self._nslookup,
-            'whois': self._whois,
-            'dig': self._dig_info,  # Adding 'dig' operation
-            'nslookup2': self._nslookup2,
-            'reverse_lookup': self._reverse_lookup,
-        }
-
-        if operation not in operations:
+        method_name = self._OPS.get(operation)
+        if method_name is None:
             return SecurityToolResult(False, None, f"Unsupported operation: {operation}")
 
         try:
-            result = operations[operation](target, **kwargs)
+            result = getattr(self, method_name)(target, **kwargs)
             return SecurityToolResult(True, result)
         except Exception as e:
             self.logger.error(f"Error in {operation}: {str(e)}")
             return SecurityToolResult(False, None, str(e))
 
+    def _resolve_all(self, domain: str) -> Tuple[List[str], List[str]]:
+        """
+        Resolves both the IPv4 and IPv6 addresses of a domain with a single resolver call.
+
+        Every address found is also recorded in an inverse index, so a later reverse lookup of it
+        can be answered without a PTR query.
+
+        Args:
+            domain (str): The domain to resolve.
+
+        Returns:
+            Tuple[List[str], List[str]]: The IPv4 and the IPv6 addresses of the domain.
+        """
+        v4, v6 = {}, {}
+        for family, _, _, _, sockaddr in socket.getaddrinfo(domain, None, type=socket.SOCK_STREAM):
+            (v4 if family == socket.AF_INET else v6)[sockaddr[0]] = None
+
+        for ip_address in (*v4, *v6):
+            self._cache.set(f"{self.__class__.__name__}:forward_name:{ip_address}", domain, expire=DNS_EXPIRE)
+
+        return list(v4), list(v6)
+
     def _nslookup(self, domain: str) -> Optional[str]:
         """
         Performs a DNS lookup for the given domain and returns the corresponding IP address.
@@ -57,23 +233,81 @@ class NetworkAnalyzer(SecurityTool):
             domain (str): The domain for which the DNS lookup is performed.
 
         Returns:
-            Optional[str]: The IP address of the domain, or None if the domain lookup fails.
+            Optional[str]: The first IPv4 address of the domain, or None if it only has IPv6 addresses.
+
+        Raises:
+            Exception: If DNS lookup fails for the given domain.
+        """
+        cache_key = f"{self.__class__.__name__}:resolve_all:{domain}"
+
+        def resolve():
+            return self._call_with_timeout(cache_key, lambda: self._resolve_all(domain),
+                                           self._dns_timeout * DNS_TRIES)
+
+        # Check cache first to avoid redundant queries; entries about to expire are refreshed in the background
+        cached = self._get_refreshing(cache_key, resolve, expire=DNS_EXPIRE)
+        if cached is not None:
+            v4, v6 = cached
+            return v4[0] if v4 else None
+
+        try:
+            # Concurrent lookups of the same domain share one resolver call; A and AAAA come back together
+            v4, v6 = self._fetch_once(cache_key, resolve, expire=DNS_EXPIRE)
+            ip_address = v4[0] if v4 else None
+            self.log_operation("nslookup", {"domain": domain, "ip": ip_address, "ipv6": v6})
+            return ip_address
+        except (socket.gaierror, TimeoutError) as e:
+            raise Exception(f"DNS lookup failed for {domain}: {str(e)}")
+
+    async def _nslookup_async(self, domain: str) -> str:
+        """
+        Resolves the A record of a domain with c-ares, without holding the GIL while waiting.
+
+        The resolver is created here rather than in __init__ so that it binds to the background
+        event loop every coroutine passed to run() executes on.
+
+        Args:
+            domain (str): The domain to resolve.
+
+        Returns:
+            str: The first IPv4 address of the domain.
+        """
+        if self._resolver is None:
+            import aiodns
+            self._resolver = aiodns.DNSResolver(nameservers=ASYNC_NAMESERVERS, timeout=self._dns_timeout,
+                                                tries=DNS_TRIES)
+
+        return (await self._resolver.query(domain, 'A'))[0].host
+
+    def _nslookup_ares(self, domain: str) -> str:
+        """
+        Performs a DNS lookup for the given domain through the asynchronous c-ares resolver.
+
+        Unlike nslookup, each query has a bounded timeout and concurrent lookups are multiplexed on
+        one event loop instead of each blocking a thread.
+
+        Args:
+            domain (str): The domain for which the DNS lookup is performed.
+
+        Returns:
+            str: The IPv4 address of the domain.
 
         Raises:
             Exception: If DNS lookup fails for the given domain.
         """
-        cache_key = f"nslookup_{domain}"
+        cache_key = f"{self.__class__.__name__}:nslookup_async:{domain}"
 
         # Check cache first to avoid redundant queries
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         try:
-            ip_address = socket.gethostbyname(domain)
-            self._cache[cache_key] = ip_address
-            self.log_operation("nslookup", {"domain": domain, "ip": ip_address})
+            from .http import run
+            ip_address = self._fetch_once(cache_key, lambda: run(self._nslookup_async(domain)), expire=DNS_EXPIRE)
+            self.log_operation("nslookup_async", {"domain": domain, "ip": ip_address})
             return ip_address
-        except socket.gaierror as e:
+        except Exception as e:
             raise Exception(f"DNS lookup failed for {domain}: {str(e)}")
 
     def _whois(self, host: str) -> dict:
@@ -89,20 +323,83 @@ class NetworkAnalyzer(SecurityTool):
         Raises:
             Exception: If WHOIS lookup fails for the given host.
         """
-        cache_key = f"whois_{host}"
+        cache_key = f"{self.__class__.__name__}:whois:{host}"
 
         # Check cache first to avoid redundant queries
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         try:
-            whois_info = whois.whois(host)
-            self._cache[cache_key] = whois_info
+            whois_info = self._fetch_once(
+                cache_key,
+                lambda: self._call_with_timeout(cache_key, lambda: self._whois_tcp(host), WHOIS_TIMEOUT),
+                expire=WHOIS_EXPIRE,
+            )
             self.log_operation("whois", {"host": host})
             return whois_info
         except Exception as e:
             raise Exception(f"WHOIS lookup failed for {host}: {str(e)}")
 
+    def _whois_tcp(self, host: str) -> dict:
+        """
+        Looks up a domain by talking to the WHOIS servers directly over TCP.
+
+        The host is reduced to its registered domain (mail.google.com -> google.com). The IANA
+        server names the registry server for the domain's TLD, which is then asked for the domain;
+        thin registries (.com, .net) only name the registrar's WHOIS server, which is asked in turn.
+        Addresses, unknown TLDs and replies without a record of the domain fall back to the whois
+        package. Both paths return the WhoisEntry key schema.
+
+        Args:
+            host (str): The host for which the WHOIS lookup is performed.
+
+        Returns:
+            dict: The WHOIS record of the domain.
+
+        Raises:
+            Exception: If no WHOIS record is found for the domain.
+        """
+        import whois
+
+        try:
+            ipaddress.ip_address(host)
+            is_address = True
+        except ValueError:
+            is_address = False
+
+        if not is_address:
+            domain = whois.extract_domain(host.lower().rstrip("."))
+            refer = _whois_referral(domain.rsplit(".", 1)[-1])
+            if refer is not None:
+                record = self._whois_record(refer, domain)
+                if record is not None:
+                    registrar_server = record["whois_server"]
+                    if registrar_server and registrar_server.lower() != refer.lower():
+                        try:
+                            # The registrar's record has the registrant details; registry fields fill the gaps
+                            registrar_record = self._whois_record(registrar_server, domain)
+                        except OSError as e:
+                            self.logger.warning(f"Registrar WHOIS server {registrar_server} failed: {str(e)}")
+                            registrar_record = None
+                        if registrar_record is not None:
+                            record = normalize_whois(registrar_record, record)
+                    return record
+
+        record = normalize_whois(whois.whois(host))
+        if not record["domain_name"]:
+            raise Exception(f"No WHOIS record found for {host}")
+        return record
+
+    @staticmethod
+    def _whois_record(server: str, domain: str) -> Optional[dict]:
+        """Queries one WHOIS server for the domain; returns None if the reply holds no record of it."""
+        reply = _whois_query(server, domain)
+        if is_no_match(reply):
+            return None
+        record = normalize_whois(parse_whois(reply))
+        return record if record["domain_name"] else None
+
     def _dig_info(self, host, **kwargs):
         """
         Performs a DIG DNS query for the given host and record type, and returns the results.
@@ -119,18 +416,20 @@ class NetworkAnalyzer(SecurityTool):
         """
         record_type = kwargs['type']
 
-        cache_key = f"dig_{host}_{record_type}"
+        cache_key = f"{self.__class__.__name__}:dig:{host}:{record_type}"
 
-        # Check cache first to avoid redundant queries
-        if cache_key in self._cache:
+        def query():
+            return self._call_with_timeout(cache_key, lambda: self._dig_resolver.query(host, record_type),
+                                           self._dns_timeout * DNS_TRIES + 1)
+
+        # Check cache first to avoid redundant queries; entries about to expire are refreshed in the background
+        cached = self._get_refreshing(cache_key, query, expire=DNS_EXPIRE)
+        if cached is not None:
             print(f"Using cached DIG info for {host} with type {record_type}")
-            return self._cache[cache_key]
+            return cached
 
         try:
-            dig_info = pd.query(host, record_type)  # Assuming pd.query retrieves the DIG info
-
-            # Cache the result
-            self._cache[cache_key] = dig_info
+            dig_info = self._fetch_once(cache_key, query, expire=DNS_EXPIRE)
 
             # Return the DIG query result
             return dig_info
@@ -139,7 +438,10 @@ class NetworkAnalyzer(SecurityTool):
 
     def _nslookup2(self, domain: str):
         """
-        Performs a DNS lookup for a given domain using Google's DNS servers.
+        Performs a DNS lookup for a given domain using public DNS servers.
+
+        Each domain always goes to the same server, chosen by a stable hash of its name, so
+        repeated lookups hit that server's warm cache while different domains spread the load.
 
         Args:
             domain (str): The domain to look up.
@@ -150,25 +452,28 @@ class NetworkAnalyzer(SecurityTool):
         Raises:
             Exception: If DNS lookup fails.
         """
-        cache_key = f"nslookup_{domain}"
+        cache_key = f"{self.__class__.__name__}:nslookup2:{domain}"
 
         # Check cache first to avoid redundant queries
-        if cache_key in self._cache:
+        cached = self._cache.get(cache_key)
+        if cached is not None:
             print(f"Using cached NSLookup result for {domain}")
-            return self._cache[cache_key]
+            return cached
 
         try:
-            # Using Google's DNS server (8.8.8.8) for DNS lookup
-            dns_query = Nslookup(dns_servers=["8.8.8.8"])
-            dns_record = dns_query.dns_lookup(domain)
+            # crc32 rather than hash(), which is salted per process, so the mapping survives restarts
+            resolver = self._resolvers[zlib.crc32(domain.lower().encode()) % len(self._resolvers)]
+
+            def lookup():
+                dns_record = resolver.dns_lookup(domain)
+                return dns_record.response_full, dns_record.answer
 
-            # Cache the result
-            self._cache[cache_key] = dns_record.answer
+            response_full, answer = self._fetch_once(cache_key, lookup, expire=DNS_EXPIRE)
 
             # Log the operation
-            self.log_operation("nslookup", {"domain": domain, "answer": dns_record.answer})
+            self.log_operation("nslookup", {"domain": domain, "answer": answer})
             # Return full DNS response and the answer
-            return dns_record.response_full, dns_record.answer
+            return response_full, answer
         except Exception as e:
             raise Exception(f"NSLookup failed for {domain}: {str(e)}")
 
@@ -176,6 +481,9 @@ class NetworkAnalyzer(SecurityTool):
         """
         Perform a reverse DNS lookup for a given IP address to get the associated domain name (PTR record).
 
+        Addresses returned by an earlier nslookup are answered with the domain they were resolved
+        from, without a PTR query.
+
         Args:
             ip_address (str): The IP address for which to perform the reverse lookup.
 
@@ -185,16 +493,25 @@ class NetworkAnalyzer(SecurityTool):
         Raises:
             Exception: If the reverse lookup fails.
         """
-        cache_key = f"reverse_lookup_{ip_address}"
+        cache_key = f"{self.__class__.__name__}:reverse_lookup:{ip_address}"
 
-        # Check cache first to avoid redundant queries
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        def lookup():
+            # Reverse lookup using socket.gethostbyaddr
+            return self._call_with_timeout(cache_key, lambda: socket.gethostbyaddr(ip_address)[0],
+                                           self._dns_timeout * DNS_TRIES)
+
+        # Check cache first to avoid redundant queries; entries about to expire are refreshed in the background
+        cached = self._get_refreshing(cache_key, lookup, expire=REVERSE_LOOKUP_EXPIRE)
+        if cached is not None:
+            return cached
+
+        forward_name = self._cache.get(f"{self.__class__.__name__}:forward_name:{ip_address}")
+        if forward_name is not None:
+            return forward_name
 
         try:
-            domain_name = socket.gethostbyaddr(ip_address)[0]  # Reverse lookup using socket.gethostbyaddr
-            self._cache[cache_key] = domain_name
+            domain_name = self._fetch_once(cache_key, lookup, expire=REVERSE_LOOKUP_EXPIRE)
             self.log_operation("reverse_lookup", {"ip": ip_address, "domain": domain_name})
             return domain_name
-        except socket.herror as e:
+        except (socket.herror, TimeoutError) as e:
             raise Exception(f"Reverse lookup failed for {ip_address}: {str(e)}")
\ No newline at end of file
@@ -1,34 +1,41 @@
+import logging
 import os
-from typing import Optional
-import json
+from functools import cached_property, lru_cache
+from typing import ClassVar, Dict, Optional
 
-from dotenv import load_dotenv
-from shodan import Shodan
 from .base import SecurityTool, SecurityToolResult
 
+# Host data changes slowly and every lookup costs API quota, so keep results for a day
+HOST_EXPIRE = 86400
 
-class ShodanAnalyzer(SecurityTool):
-    """Class for interacting with Shodan API to gather details about a target system."""
 
-    def __init__(self):
-        """
-        Initializes the ShodanAnalyzer instance.
+@lru_cache(maxsize=1)
+def _get_api(api_key: str):
+    """Returns the Shodan client for the API key, shared by every ShodanAnalyzer instance."""
+    from shodan import Shodan
+    from .http import get_session
+    api = Shodan(api_key)
+    # Send requests through the shared keep-alive pool instead of the client's private session
+    api._session = get_session()
+    return api
 
-        Attributes:
-            _api (Shodan): The Shodan API client.
-            _cache (dict): A dictionary to cache the results of previous queries to improve performance.
-        """
-        super().__init__()
 
-        # Завантажуємо змінні середовища з .env файлу
-        load_dotenv()
+class ShodanAnalyzer(SecurityTool):
+    """Class for interacting with Shodan API to gather details about a target system."""
 
+    # Maps each supported operation to the name of the method that implements it
+    _OPS: ClassVar[Dict[str, str]] = {
+        'get_host_details': '_get_host_details',
+    }
+
+    @cached_property
+    def _api(self):
+        """The Shodan API client, created on first use."""
         # Отримуємо API-ключ із середовища
         api_key = os.getenv('SHODAN_API_KEY')
         if api_key is None:
             raise ValueError("Shodan API key is missing in environment variables.")
-        self._api = Shodan(api_key)
-        self._cache = {}  # Simple cache to store results of previous queries
+        return _get_api(api_key)
 
     def execute(self, operation: str, target: str, **kwargs) -> SecurityToolResult:
         """
@@ -42,15 +49,12 @@ class ShodanAnalyzer(SecurityTool):
         Returns:
             SecurityToolResult: The result of the operation, either successful with data or failed with an error message.
         """
-        operations = {
-            'get_host_details': self._get_host_details,
-        }
-
-        if operation not in operations:
+        method_name = self._OPS.get(operation)
+        if method_name is None:
             return SecurityToolResult(False, None, f"Unsupported operation: {operation}")
 
         try:
-            result = operations[operation](target, **kwargs)
+            result = getattr(self, method_name)(target, **kwargs)
             return SecurityToolResult(True, result)
         except Exception as e:
             self.logger.error(f"Error in {operation}: {str(e)}")
@@ -69,17 +73,21 @@ class ShodanAnalyzer(SecurityTool):
         Raises:
             Exception: If the Shodan API query fails for the given IP address.
         """
-        cache_key = f"shodan_{host}"
+        cache_key = f"{self.__class__.__name__}:get_host_details:{host}"
 
         # Check cache first to avoid redundant queries
-        if cache_key in self._cache:
-            return self._cache[cache_key]
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
 
         try:
-            ipinfo = self._api.host(host)
+            # Concurrent callers for the same IP share one API request
+            ipinfo = self._fetch_once(cache_key, lambda: self._api.host(host), expire=HOST_EXPIRE)
 
-            self._cache[cache_key] = ipinfo
-            self.log_operation("shodan", {"ip": host, "info": json.dumps(ipinfo, indent=4)})
+            # Serializing the full host record is only worth it when INFO records are emitted
+            if self.logger.isEnabledFor(logging.INFO):
+                import orjson
+                self.log_operation("shodan", {"ip": host, "info": orjson.dumps(ipinfo, default=str).decode()})
             return ipinfo
         except Exception as e:
             raise Exception(f"Shodan query failed for {host}: {str(e)}")
@@ -0,0 +1,150 @@
+# core/whois_parser.py
+from datetime import datetime
+import re
+from typing import Any, Dict, List, Mapping, Optional, Union
+
+# Fields are split with str.partition() rather than a regex, so parsing stays linear in the size of
+# the reply whatever a hostile server sends. The patterns below anchor on line starts and literals.
+
+# Lines starting with these are comments (%, #) or notices (>>> ... <<<), not fields
+COMMENT_PREFIXES = ("%", "#", ">")
+# The registry server IANA refers a TLD to
+RE_REFER = re.compile(r"(?m)^refer:[ \t]*(\S+)")
+# Replies registries send for domains they hold no record of
+RE_NO_MATCH = re.compile(
+    r"(?im)^[ \t]*(?:no match\b|not found\b|no data found|no entries found|no object found|"
+    r"domain not found|status:[ \t]*(?:free|available))"
+)
+
+# Raw WHOIS keys (lower-cased) mapped to the keys python-whois's WhoisEntry uses, so both lookup
+# paths return the same schema
+FIELD_ALIASES = {
+    "domain name": "domain_name",
+    "domain": "domain_name",
+    "registrar": "registrar",
+    "sponsoring registrar": "registrar",
+    "registrar url": "registrar_url",
+    "reseller": "reseller",
+    "registrar whois server": "whois_server",
+    "whois server": "whois_server",
+    "referral url": "referral_url",
+    "updated date": "updated_date",
+    "last updated": "updated_date",
+    "last-update": "updated_date",
+    "changed": "updated_date",
+    "creation date": "creation_date",
+    "created": "creation_date",
+    "registered": "creation_date",
+    "registry expiry date": "expiration_date",
+    "registrar registration expiration date": "expiration_date",
+    "expiration date": "expiration_date",
+    "expiry date": "expiration_date",
+    "paid-till": "expiration_date",
+    "name server": "name_servers",
+    "nserver": "name_servers",
+    "domain status": "status",
+    "status": "status",
+    "dnssec": "dnssec",
+    "registrant name": "name",
+    "registrant organization": "org",
+    "registrant street": "address",
+    "registrant city": "city",
+    "registrant state/province": "state",
+    "registrant postal code": "registrant_postal_code",
+    "registrant country": "country",
+    "tech name": "tech_name",
+    "tech organization": "tech_org",
+    "admin name": "admin_name",
+    "admin organization": "admin_org",
+}
+WHOIS_KEYS = frozenset(FIELD_ALIASES.values()) | {"emails"}
+# Keys that hold every value found; the others keep the first one
+LIST_KEYS = frozenset({"name_servers", "status", "emails"})
+DATE_KEYS = frozenset({"creation_date", "updated_date", "expiration_date"})
+
+
+def is_no_match(text: str) -> bool:
+    """Returns True if a registry reply says it has no record of the domain."""
+    return RE_NO_MATCH.search(text) is not None
+
+
+def parse_refer(text: str) -> Optional[str]:
+    """Returns the WHOIS server an IANA response refers to, or None if there is no referral."""
+    match = RE_REFER.search(text)
+    return match.group(1) if match else None
+
+
+def parse_whois(text: str) -> Dict[str, Union[str, List[str]]]:
+    """
+    Parses the "key: value" lines of a WHOIS response into a dict with lower-cased keys.
+
+    Each line is split at its first colon; lines without a key or a value, comments and notices
+    are skipped.
+
+    Keys that appear more than once (name servers, statuses) collect their values in a list.
+
+    Args:
+        text (str): The raw WHOIS response.
+
+    Returns:
+        Dict[str, Union[str, List[str]]]: The WHOIS fields.
+    """
+    fields: Dict[str, Union[str, List[str]]] = {}
+    for line in text.splitlines():
+        key, sep, value = line.partition(":")
+        key, value = key.strip().lower(), value.strip()
+        if not sep or not key or not value or key.startswith(COMMENT_PREFIXES):
+            continue
+        if key not in fields:
+            fields[key] = value
+        elif isinstance(fields[key], list):
+            fields[key].append(value)
+        else:
+            fields[key] = [fields[key], value]
+    return fields
+
+
+def _parse_date(value: Any) -> Any:
+    """Converts an ISO 8601 date string into a datetime, leaving anything else as it is."""
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return value
+
+
+def normalize_whois(*sources: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    Maps parsed WHOIS fields, or a python-whois WhoisEntry, onto the WhoisEntry key schema.
+
+    Fields outside the schema (notices, terms of use) are dropped. name_servers, status and emails
+    are always lists; dates are datetimes where they are in ISO 8601 form; every other key keeps
+    its first value. Several sources (a registrar and a registry reply) are merged in order: the
+    first one with a value wins, and lists collect the values of all of them.
+
+    Args:
+        *sources (Mapping[str, Any]): Outputs of parse_whois(), WhoisEntry objects or earlier records.
+
+    Returns:
+        Dict[str, Any]: The WHOIS record, with a None for every key that has no value.
+    """
+    record: Dict[str, Any] = {key: [] if key in LIST_KEYS else None for key in WHOIS_KEYS}
+    for raw_key, raw_value in (item for fields in sources for item in fields.items()):
+        if raw_key in WHOIS_KEYS:
+            key = raw_key
+        elif raw_key.endswith("email"):
+            key = "emails"
+        else:
+            key = FIELD_ALIASES.get(raw_key)
+        if key is None or raw_value is None:
+            continue
+
+        values = raw_value if isinstance(raw_value, list) else [raw_value]
+        if key in LIST_KEYS:
+            if key == "name_servers":
+                values = [value.lower() for value in values]
+            record[key].extend(value for value in values if value not in record[key])
+        elif record[key] is None and values:
+            record[key] = _parse_date(values[0]) if key in DATE_KEYS else values[0]
+    return record
@@ -1,8 +1,17 @@
 # security_toolkit.py
+import asyncio
+import atexit
 import logging
-from typing import Dict, Any
-from core.network import NetworkAnalyzer
-from core.forensics import ForensicsAnalyzer
+import os
+import queue
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from logging.handlers import QueueHandler, QueueListener
+from threading import Lock
+from typing import Awaitable, Dict, Any, List, Tuple, TypeVar, Union
+from tools.core.network import NetworkAnalyzer
+from tools.core.forensics import ForensicsAnalyzer
 from tools.core.active_rec import ActiveReconnaissance
 from tools.core.base import SecurityToolResult
 from tools.core.censys import CensysAnalyzer
@@ -11,21 +20,65 @@ from tools.core.google_dorks import GoogleDorks
 from tools.core.ipinfo import IpinfoAnalyzer
 from tools.core.shodan import ShodanAnalyzer
 
+T = TypeVar("T")
+
+
+def run_async(main: Awaitable[T]) -> T:
+    """
+    Run a coroutine, such as SecurityToolkit.execute_many(), to completion on a new event loop
+
+    The loop uses libuv through uvloop where it is installed, which dispatches I/O completions with
+    fewer syscalls than the default selector loop; otherwise this is asyncio.run(). The global event
+    loop policy is left alone. When fanning out thousands of lookups, raise SECTK_IO_POOL along with
+    it so the thread pool does not become the limit.
+
+    Args:
+        main: The coroutine to run
+
+    Returns:
+        The coroutine's result
+    """
+    if sys.platform != "win32":
+        try:
+            import uvloop
+        except ImportError:
+            pass
+        else:
+            return uvloop.run(main)
+    return asyncio.run(main)
+
 
 class SecurityToolkit:
     """Main interface for the security toolkit"""
 
+    # Operations that have a batched counterpart, used when the target is a list of hosts
+    _BATCH_OPERATIONS = {
+        ('ipinfo', 'get_host_details'): 'get_host_details_batch',
+        ('crt_ifo', 'cert_query'): 'bulk_cert_query',
+        # ('censys', 'get_host_details'): 'bulk_host_details',
+    }
+
     def __init__(self):
-        self._tools = {
-            'network': NetworkAnalyzer(),
-            'forensics': ForensicsAnalyzer(),
-            'google_dorks': GoogleDorks(),  # Adding Google Dorks tool to the toolkit
-            'shodan': ShodanAnalyzer(),
-            # 'censys': CensysAnalyzer(),
-            'ipinfo': IpinfoAnalyzer(),
-            'crt_ifo': CrtshAnalyzer(),
-            'active_reconnaissance': ActiveReconnaissance(),
+        # Tools are only built when first used, so a script pays for (and needs keys for) just the tools it calls
+        self._factories = {
+            'network': NetworkAnalyzer,
+            'forensics': ForensicsAnalyzer,
+            'google_dorks': GoogleDorks,  # Adding Google Dorks tool to the toolkit
+            'shodan': ShodanAnalyzer,
+            # 'censys': CensysAnalyzer,
+            'ipinfo': IpinfoAnalyzer,
+            'crt_ifo': CrtshAnalyzer,
+            'active_reconnaissance': ActiveReconnaissance,
         }
+        self._tool_types = frozenset(self._factories)
+        self._tools = {}
+        self._tools_lock = Lock()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        # Every (tool, operation) pair of the tools built so far, resolved to its bound method, so dispatch is one lookup
+        self._dispatch = {}
+        # Every operation is blocking network I/O, so async callers run them on this pool
+        self._pool = ThreadPoolExecutor(max_workers=int(os.getenv("SECTK_IO_POOL", "64")))
 
     def execute_tool(self,
                      tool_type: str,
@@ -35,6 +88,63 @@ class SecurityToolkit:
         """
         Execute a security tool operation
 
+        Args:
+            tool_type: Type of security tool ('network', 'forensics', etc.)
+            operation: Specific operation to perform
+            target: Target for the operation, or a list of targets for operations with a batched variant
+            **kwargs: Additional arguments for the operation
+
+        Returns:
+            SecurityToolResult object containing the operation result
+        """
+        # Send lists of targets through the batch endpoint instead of one request per target
+        if isinstance(target, (list, tuple)):
+            operation = self._BATCH_OPERATIONS.get((tool_type, operation), operation)
+            target = list(target)
+
+        fn = self._dispatch.get((tool_type, operation))
+        if fn is None:
+            if tool_type not in self._tool_types:
+                return SecurityToolResult(False, None, f"Unsupported tool type: {tool_type}")
+            if operation not in self._factories[tool_type]._OPS:
+                return SecurityToolResult(False, None, f"Unsupported operation: {operation}")
+
+        try:
+            if fn is None:
+                fn = self._load_tool(tool_type)[(tool_type, operation)]
+            return SecurityToolResult(True, fn(target, **kwargs))
+        except Exception as e:
+            self.logger.error(f"Error in {tool_type}.{operation}: {str(e)}")
+            return SecurityToolResult(False, None, str(e))
+
+    def _load_tool(self, tool_type: str) -> Dict[Tuple[str, str], Any]:
+        """
+        Build a tool on first use and add its operations to the dispatch table
+
+        Args:
+            tool_type: Type of security tool ('network', 'forensics', etc.)
+
+        Returns:
+            The dispatch table
+        """
+        with self._tools_lock:
+            if tool_type not in self._tools:
+                tool = self._factories[tool_type]()
+                self._dispatch.update({
+                    (tool_type, op_name): getattr(tool, method_name)
+                    for op_name, method_name in tool._OPS.items()
+                })
+                self._tools[tool_type] = tool
+        return self._dispatch
+
+    async def execute_tool_async(self,
+                                 tool_type: str,
+                                 operation: str,
+                                 target: Any,
+                                 **kwargs) -> SecurityToolResult:
+        """
+        Execute a security tool operation without blocking the event loop
+
         Args:
             tool_type: Type of security tool ('network', 'forensics', etc.)
             operation: Specific operation to perform
@@ -44,21 +154,62 @@ class SecurityToolkit:
         Returns:
             SecurityToolResult object containing the operation result
         """
-        if tool_type not in self._tools:
-            return SecurityToolResult(False, None, f"Unsupported tool type: {tool_type}")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._pool, partial(self.execute_tool, tool_type, operation, target, **kwargs)
+        )
+
+    async def execute_many(self,
+                           jobs: List[Union[Tuple[str, str, Any], Tuple[str, str, Any, Dict[str, Any]]]]
+                           ) -> List[Union[SecurityToolResult, BaseException]]:
+        """
+        Execute several security tool operations concurrently
+
+        The total time is roughly that of the slowest job rather than the sum of all of them.
+
+        Args:
+            jobs: A list of (tool_type, operation, target) or (tool_type, operation, target, kwargs) tuples;
+                kwargs holds the additional arguments for the operation, such as type= for 'dig'
+
+        Returns:
+            The results in the same order as the jobs; a job that raised is returned as its exception
+        """
+        return await asyncio.gather(
+            *[self.execute_tool_async(*job[:3], **(job[3] if len(job) > 3 else {})) for job in jobs],
+            return_exceptions=True,
+        )
+
+
+def configure_logging(level: int = logging.INFO) -> QueueListener:
+    """
+    Configure logging so that records are written by a background thread
+
+    Tools only put records on a queue, so slow log output never delays an operation.
+
+    Args:
+        level: Root logger level
 
+    Returns:
+        The started QueueListener; it is stopped, flushing pending records, at interpreter exit
+    """
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
 
+    log_queue = queue.Queue(-1)
+    listener = QueueListener(log_queue, handler)
+    listener.start()
+    atexit.register(listener.stop)
 
-        return self._tools[tool_type].execute(operation, target, **kwargs)
+    root = logging.getLogger()
+    root.handlers[:] = [QueueHandler(log_queue)]
+    root.setLevel(level)
+    return listener
 
 
 # Example usage
 def main():
     # Configure logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    configure_logging(logging.INFO)
 
     # Create toolkit instance
     toolkit = SecurityToolkit()
@@ -107,8 +258,7 @@ def main():
 
     # result = toolkit.execute_tool('crt_info', 'cert_query', 'abc.xyz')
 
-    #todo fix without target
-    # result = toolkit.execute_tool('active_reconnaissance', 'print_net_connections', target='192.168.127.12')
+    # result = toolkit.execute_tool('active_reconnaissance', 'print_net_connections', target=None)
 
 
 